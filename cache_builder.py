@@ -1,5 +1,6 @@
 import os
 import re
+import sys
 import csv
 import requests
 from urllib.parse import urljoin, quote_plus
@@ -354,24 +355,27 @@ def compare_species_lists(api_species, cached_species):
 
     return new_species
 
-def ensure_cache_is_built(incremental=False, check_only=False):
+def ensure_cache_is_built(incremental=False, check_only=False, species_list=None, cached_species=None):
     """Checks for and builds the offline image cache with parallel processing.
 
     Args:
         incremental: If True, only downloads new species not in cache
         check_only: If True, only reports cache status without downloading
+        species_list: Species to cache (loaded from SPECIES_FILE if None)
+        cached_species: Species already cached (scanned from CACHE_DIRECTORY if None)
 
     Returns:
         int: Exit code (0=success, 1=error, 2=no changes needed)
     """
     print("--- Checking local image cache... ---")
-    bird_species_to_cache = load_species_from_file(SPECIES_FILE)
+    bird_species_to_cache = species_list if species_list is not None else load_species_from_file(SPECIES_FILE)
     if not bird_species_to_cache:
         print(f"WARNING: '{SPECIES_FILE}' not found or empty. Cannot build cache.")
         return 1
 
     # Get currently cached species
-    cached_species = get_cached_species_list()
+    if cached_species is None:
+        cached_species = get_cached_species_list()
     total_species = len(bird_species_to_cache)
     cached_count = len(cached_species)
 
@@ -454,16 +458,99 @@ def resize_cached_images():
                     print(f"Could not resize {image_path}. Error: {e}")
     print("--- Image resizing complete. ---")
 
-# This allows the script to be run directly from the command line
-if __name__ == '__main__':
-    import sys
+class CacheBuilder:
+    """Runs cache operations, sharing the species list and cache scan between them.
+
+    The species file and cache directory are read at most once per instance
+    and reloaded only after an operation changes them.
+    """
+
+    def __init__(self):
+        self._species_list = None
+        self._cached_species = None
+
+    @property
+    def species_list(self):
+        """Species from SPECIES_FILE, loaded on first use."""
+        if self._species_list is None:
+            self._species_list = load_species_from_file(SPECIES_FILE)
+        return self._species_list
+
+    @property
+    def cached_species(self):
+        """Species with a complete image cache, scanned on first use."""
+        if self._cached_species is None:
+            self._cached_species = get_cached_species_list()
+        return self._cached_species
+
+    def update_species(self, skip_confirmation=False):
+        """Updates the species list from the BirdNET-Go API.
+
+        Returns:
+            bool: True if the species file was updated
+        """
+        updated = update_species_list_from_api(skip_confirmation=skip_confirmation)
+        if updated:
+            self._species_list = None
+        return updated
+
+    def check(self):
+        """Reports cache status without downloading.
+
+        Returns:
+            int: Exit code (0=species missing, 1=error, 2=cache complete)
+        """
+        return ensure_cache_is_built(incremental=True, check_only=True,
+                                     species_list=self.species_list,
+                                     cached_species=self.cached_species)
+
+    def incremental_sync(self):
+        """Downloads images only for species not yet in the cache.
+
+        Returns:
+            int: Exit code (0=success, 1=error, 2=no changes needed)
+        """
+        return self._build(incremental=True)
+
+    def full_build(self):
+        """Processes every species in the list.
+
+        Returns:
+            int: Exit code (0=success, 1=error)
+        """
+        return self._build(incremental=False)
+
+    def _build(self, incremental):
+        exit_code = ensure_cache_is_built(incremental=incremental,
+                                          species_list=self.species_list,
+                                          cached_species=self.cached_species)
+        # Only resize images if we actually downloaded something
+        if exit_code == 0:
+            self._cached_species = None
+            resize_cached_images()
+        return exit_code
+
+def main(argv=None, builder=None):
+    """Command-line entry point.
+
+    Args:
+        argv: List of command-line flags (defaults to sys.argv[1:])
+        builder: CacheBuilder to reuse across calls (a new one is created if None)
+
+    Returns:
+        int: Exit code (0=success, 1=error, 2=no changes needed)
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if builder is None:
+        builder = CacheBuilder()
 
     # Parse command-line arguments
-    check_only = '--check-only' in sys.argv
-    incremental = '--incremental' in sys.argv
-    update_species = '--update-species' in sys.argv
-    skip_confirmation = '--skip-confirmation' in sys.argv or '--yes' in sys.argv or '-y' in sys.argv
-    help_flag = '--help' in sys.argv or '-h' in sys.argv
+    check_only = '--check-only' in argv
+    incremental = '--incremental' in argv
+    update_species = '--update-species' in argv
+    skip_confirmation = '--skip-confirmation' in argv or '--yes' in argv or '-y' in argv
+    help_flag = '--help' in argv or '-h' in argv
 
     # Display help
     if help_flag:
@@ -483,24 +570,25 @@ if __name__ == '__main__':
         print("  python3 cache_builder.py --incremental            # Download only new species")
         print("  python3 cache_builder.py --check-only             # Check status without downloading")
         print("  python3 cache_builder.py --update-species --incremental  # Update list and download new species")
-        sys.exit(0)
+        return 0
 
     # Check for --update-species flag
     if update_species:
         print("--- Updating Species List from API ---")
-        if not update_species_list_from_api(skip_confirmation=skip_confirmation):
+        if not builder.update_species(skip_confirmation=skip_confirmation):
             print("[ERROR] Failed to update species list")
-            sys.exit(1)
+            return 1
         print("[SUCCESS] Species list updated successfully")
         # Don't prompt in automated mode, just continue to cache building
 
     # Build/check cache
     print("--- Starting Offline Image Cache Builder ---")
-    exit_code = ensure_cache_is_built(incremental=incremental or check_only, check_only=check_only)
-
-    # Only resize images if we actually downloaded something
-    if not check_only and exit_code == 0:
-        resize_cached_images()
+    if check_only:
+        exit_code = builder.check()
+    elif incremental:
+        exit_code = builder.incremental_sync()
+    else:
+        exit_code = builder.full_build()
 
     # Print final status
     if exit_code == 0:
@@ -510,4 +598,8 @@ if __name__ == '__main__':
     else:
         print(f"{RED}--- Cache building failed. ---{NC}")
 
-    sys.exit(exit_code)
\ No newline at end of file
+    return exit_code
+
+# This allows the script to be run directly from the command line
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,6 +9,9 @@ This script runs on system startup to:
 3. Fetch location-specific species list
 4. Update image cache incrementally (only new species)
 
+Options:
+  --force-detect  Ignore the cached detection result and re-detect location
+
 Exit Codes:
   0  Success - location updated and cache synchronized
   1  Error - critical failure (permissions, API down, etc.)
@@ -16,7 +19,11 @@ Exit Codes:
 """
 
 import os
+import io
 import sys
+import asyncio
+import contextlib
+import time
 import logging
 from pathlib import Path
 
@@ -26,12 +33,27 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from utils.geolocation import LocationDetector
 from utils.config_manager import BirdNETConfigManager
 import subprocess
+import http.client
+
+try:
+    from cache_builder import CacheBuilder, main as cache_builder_main
+except ImportError:
+    # Missing cache_builder dependencies; fall back to running it as a subprocess
+    CacheBuilder = cache_builder_main = None
 
 # --- Configuration ---
 WORKING_DIR = Path(__file__).parent
 CACHE_BUILDER_SCRIPT = WORKING_DIR / "cache_builder.py"
+# Run cache_builder inside this interpreter; set False to isolate it in a subprocess
+CACHE_BUILDER_IN_PROCESS = True
 LOG_FILE = WORKING_DIR / "location_manager.log"
 BIRDNET_CONFIG_PATH = "/root/birdnet-go-app/config/config.yaml"
+BIRDNET_GO_HOST = "localhost"
+BIRDNET_GO_PORT = 8080
+DETECT_CACHE = WORKING_DIR / ".location_cache.json"
+
+# How long a cached location detection result is reused (seconds)
+LOCATION_DETECT_TTL = 6 * 60 * 60
 
 # Significant distance threshold (km) - update if location changed by this much
 LOCATION_CHANGE_THRESHOLD_KM = 100
@@ -47,51 +69,121 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Persistent connection so repeated BirdNET-Go probes reuse one socket
+_birdnet_conn = http.client.HTTPConnection(BIRDNET_GO_HOST, BIRDNET_GO_PORT, timeout=2)
+
 # --- Helper Functions ---
-def run_cache_builder(flags: list) -> int:
+@contextlib.contextmanager
+def _cache_builder_output():
+    """Copy cache builder output verbatim to stdout and the log file.
+
+    Output is written as raw text between begin/end markers rather than as one
+    log record per line.
+
+    Yields:
+        Function that writes a chunk of output
+    """
+    logger.info("--- cache_builder output begin ---")
+    # Bind the real stdout now; in-process runs redirect sys.stdout to write()
+    stdout = sys.stdout
+    try:
+        # Line buffered so output already printed survives the service being killed
+        with open(LOG_FILE, 'a', buffering=1) as log_file:
+            def write(text: str):
+                stdout.write(text)
+                stdout.flush()
+                log_file.write(text)
+            yield write
+    finally:
+        logger.info("--- cache_builder output end ---")
+
+class _WriteThrough(io.TextIOBase):
+    """Text stream that hands every write straight to a callback."""
+
+    def __init__(self, write):
+        super().__init__()
+        self._write = write
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._write(text)
+        return len(text)
+
+def _run_cache_builder_in_process(flags: list, builder) -> int:
+    """Run cache_builder.main() in this interpreter, streaming its output."""
+    logger.info(f"Running cache builder in-process: {' '.join(flags)}")
+
+    # cache_builder uses paths relative to the install directory
+    previous_cwd = os.getcwd()
+    os.chdir(WORKING_DIR)
+    try:
+        # Pass output through as it is printed instead of after the build finishes
+        with _cache_builder_output() as write:
+            stream = _WriteThrough(write)
+            with contextlib.redirect_stdout(stream), contextlib.redirect_stderr(stream):
+                return cache_builder_main(flags, builder=builder)
+    finally:
+        os.chdir(previous_cwd)
+
+def _run_cache_builder_subprocess(flags: list) -> int:
+    """Run cache_builder.py in a separate python3 process, streaming its output."""
+    # -u: unbuffered child stdout so lines arrive as they are printed
+    cmd = ["python3", "-u", str(CACHE_BUILDER_SCRIPT)] + flags
+    logger.info(f"Running cache builder: {' '.join(cmd)}")
+
+    with subprocess.Popen(
+        cmd,
+        cwd=str(WORKING_DIR),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1
+    ) as process:
+        # Pass lines through as they arrive instead of after the build finishes
+        with _cache_builder_output() as write:
+            for line in process.stdout:
+                write(line)
+        return process.wait()
+
+def run_cache_builder(flags: list, builder=None) -> int:
     """Run cache_builder.py with specified flags.
 
     Args:
         flags: List of command-line flags (e.g., ['--update-species', '--incremental'])
+        builder: Shared CacheBuilder for in-process runs, so the species list
+            and cache scan are reused across calls
 
     Returns:
         Exit code from cache_builder.py
     """
     try:
-        cmd = ["python3", str(CACHE_BUILDER_SCRIPT)] + flags
-        logger.info(f"Running cache builder: {' '.join(cmd)}")
-
-        result = subprocess.run(
-            cmd,
-            cwd=str(WORKING_DIR),
-            capture_output=True,
-            text=True
-        )
-
-        # Log output
-        if result.stdout:
-            for line in result.stdout.splitlines():
-                logger.info(f"  [cache_builder] {line}")
-
-        if result.stderr:
-            for line in result.stderr.splitlines():
-                logger.warning(f"  [cache_builder] {line}")
+        if CACHE_BUILDER_IN_PROCESS and cache_builder_main is not None:
+            exit_code = _run_cache_builder_in_process(flags, builder)
+        else:
+            exit_code = _run_cache_builder_subprocess(flags)
 
-        logger.info(f"Cache builder exit code: {result.returncode}")
-        return result.returncode
+        logger.info(f"Cache builder exit code: {exit_code}")
+        return exit_code
 
     except Exception as e:
-        logger.error(f"Failed to run cache builder: {e}")
+        logger.exception(f"Failed to run cache builder: {e}")
         return 1
 
 def check_birdnet_go_running() -> bool:
     """Check if BirdNET-Go service is running and accessible."""
+    global _birdnet_conn
     try:
-        import requests
         # Try the API endpoint instead of /health (which doesn't exist)
-        response = requests.get("http://localhost:8080/api/v2/detections/recent", timeout=5)
-        return response.status_code == 200
+        _birdnet_conn.request("GET", "/api/v2/detections/recent")
+        response = _birdnet_conn.getresponse()
+        response.read()
+        return response.status == 200
     except Exception:
+        # Drop the broken socket; the next probe reconnects
+        _birdnet_conn.close()
+        _birdnet_conn = http.client.HTTPConnection(BIRDNET_GO_HOST, BIRDNET_GO_PORT, timeout=2)
         return False
 
 def wait_for_birdnet_go(max_wait_seconds: int = 30) -> bool:
@@ -103,28 +195,66 @@ def wait_for_birdnet_go(max_wait_seconds: int = 30) -> bool:
     Returns:
         True if BirdNET-Go became available, False if timeout
     """
-    import time
     logger.info(f"Waiting for BirdNET-Go to become available (max {max_wait_seconds}s)...")
 
-    for i in range(max_wait_seconds):
+    # Exponential backoff: probe quickly at first, then back off to 2s
+    delay = 0.1
+    start = time.monotonic()
+    while time.monotonic() - start < max_wait_seconds:
         if check_birdnet_go_running():
-            logger.info(f"BirdNET-Go is available (waited {i+1}s)")
+            logger.info(f"BirdNET-Go is available (waited {time.monotonic() - start:.1f}s)")
             return True
-        time.sleep(1)
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
 
     logger.warning(f"BirdNET-Go did not become available after {max_wait_seconds}s")
     return False
 
+async def _wait_and_detect_concurrently(location_detector: LocationDetector):
+    """Run the BirdNET-Go wait and location detection in parallel threads."""
+    logger.info("Detecting current location...")
+    return await asyncio.gather(
+        asyncio.to_thread(wait_for_birdnet_go),
+        asyncio.to_thread(location_detector.detect_location, force_refresh=True)
+    )
+
+def wait_and_detect_location(force_detect: bool = False):
+    """Wait for BirdNET-Go and obtain the device location.
+
+    Both steps block on network I/O and are independent, so when no fresh
+    cached detection exists they run concurrently.
+
+    Args:
+        force_detect: If True, bypass the cached detection result
+
+    Returns:
+        Tuple of (BirdNET-Go available, location dict or None)
+    """
+    location_detector = LocationDetector(cache_path=str(DETECT_CACHE), cache_ttl=LOCATION_DETECT_TTL)
+
+    detected_location = None if force_detect else location_detector.get_cached_location()
+    if detected_location:
+        logger.info("Using cached location detection")
+        return wait_for_birdnet_go(), detected_location
+
+    birdnet_available, detected_location = asyncio.run(_wait_and_detect_concurrently(location_detector))
+    return birdnet_available, detected_location
+
 # --- Main Logic ---
-def main():
-    """Main location manager workflow."""
+def main(force_detect: bool = False):
+    """Main location manager workflow.
+
+    Args:
+        force_detect: If True, bypass the cached detection result
+    """
     logger.info("=" * 60)
     logger.info("BirdNET Display - Location Manager Starting")
     logger.info("=" * 60)
 
     try:
-        # Step 1: Wait for BirdNET-Go to be available
-        if not wait_for_birdnet_go():
+        # Step 1: Wait for BirdNET-Go and detect location (concurrently when not cached)
+        birdnet_available, detected_location = wait_and_detect_location(force_detect)
+        if not birdnet_available:
             logger.error("BirdNET-Go is not available. Cannot proceed.")
             logger.info("Location manager will exit. Manual intervention required.")
             return 1
@@ -146,11 +276,7 @@ def main():
         else:
             logger.info("No valid location configured (0,0 or not set)")
 
-        # Step 4: Detect new location
-        logger.info("Detecting current location...")
-        location_detector = LocationDetector()
-        detected_location = location_detector.detect_location()
-
+        # Step 4: Fall back to the configured location if detection failed
         if not detected_location:
             logger.warning("Could not detect location using any method")
 
@@ -192,28 +318,29 @@ def main():
             location_changed = True
             logger.info("First-time location setup")
 
+        # One builder for every cache_builder call in this run, so the species
+        # list and cache directory are read once
+        cache_builder = CacheBuilder() if CacheBuilder is not None else None
+
         # Step 6: Update configuration if needed
         if location_changed:
             logger.info("Updating BirdNET-Go configuration with new location...")
 
-            if config_manager.set_location(
+            # Patches only latitude/longitude in config.yaml, keeping comments intact;
+            # falls back to a full save if the patched file doesn't re-parse to these values
+            if config_manager.save_location_inplace(
                 detected_location['latitude'],
-                detected_location['longitude']
+                detected_location['longitude'],
+                create_backup=True
             ):
-                logger.info("Configuration updated successfully")
-
-                if config_manager.save(create_backup=True):
-                    logger.info("Configuration saved with backup")
-                else:
-                    logger.error("Failed to save configuration")
-                    return 1
+                logger.info("Configuration saved with backup")
             else:
-                logger.error("Failed to update location in configuration")
+                logger.error("Failed to save location to configuration")
                 return 1
 
             # Step 7: Update species list from API
             logger.info("Fetching updated species list from BirdNET-Go API...")
-            exit_code = run_cache_builder(['--update-species', '--incremental', '--yes'])
+            exit_code = run_cache_builder(['--update-species', '--incremental', '--yes'], cache_builder)
 
             if exit_code == 1:
                 logger.error("Failed to update species list and cache")
@@ -229,11 +356,11 @@ def main():
         else:
             # Step 8: Location unchanged, check cache status
             logger.info("Location unchanged, checking cache status...")
-            exit_code = run_cache_builder(['--check-only'])
+            exit_code = run_cache_builder(['--check-only'], cache_builder)
 
             if exit_code == 1:
                 logger.warning("Cache check failed, attempting incremental update...")
-                exit_code = run_cache_builder(['--incremental'])
+                exit_code = run_cache_builder(['--incremental'], cache_builder)
 
                 if exit_code == 0:
                     logger.info("Cache synchronized successfully")
@@ -264,5 +391,5 @@ def main():
 
 
 if __name__ == '__main__':
-    exit_code = main()
+    exit_code = main(force_detect='--force-detect' in sys.argv)
     sys.exit(exit_code)
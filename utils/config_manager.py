@@ -5,16 +5,117 @@ Handles reading and writing BirdNET-Go YAML configuration files.
 
 import yaml
 import os
+import re
 import shutil
+import stat
+from math import radians, sin, cos, sqrt, atan2, pi
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+# Prefer the libyaml-backed C loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader, CSafeDumper
+except ImportError:
+    from yaml import SafeLoader as CSafeLoader, SafeDumper as CSafeDumper
+
 # Color codes for terminal output
 GREEN = '\033[0;32m'
 YELLOW = '\033[1;33m'
 RED = '\033[0;31m'
 NC = '\033[0m'  # No Color
 
+# Marks get_location()'s cache as empty (None is a valid cached result)
+_NOT_CACHED = object()
+
+# Setting paths that save_location_inplace() can write without a full dump
+_LOCATION_KEYS = {('birdnet', 'latitude'), ('birdnet', 'longitude')}
+
+# Number of timestamped config backups to keep
+MAX_BACKUPS = 10
+
+# Earth radius in kilometers, and the length of one degree of arc along a great circle
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = EARTH_RADIUS_KM * pi / 180
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two coordinates.
+    
+    Args:
+        lat1, lon1: First coordinate in degrees
+        lat2, lon2: Second coordinate in degrees
+    
+    Returns:
+        Distance in kilometers
+    """
+    lat1 = radians(lat1)
+    lon1 = radians(lon1)
+    lat2 = radians(lat2)
+    lon2 = radians(lon2)
+    
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * atan2(sqrt(a), sqrt(1-a))
+    
+    return EARTH_RADIUS_KM * c
+
+
+def _section(mapping: Any, key: str) -> Dict[str, Any]:
+    """
+    Look up a nested config section, treating missing or non-mapping values as empty.
+    
+    Args:
+        mapping: Parsed config (or section) to look in
+        key: Section name
+    
+    Returns:
+        The section dict, or an empty dict
+    """
+    value = mapping.get(key) if isinstance(mapping, dict) else None
+    return value if isinstance(value, dict) else {}
+
+
+def _write_atomic(path: str, text: str):
+    """
+    Write text to a file so readers see either the old or the new contents.
+    
+    The data is written and fsynced to a temporary file, which then replaces
+    the destination in a single rename. The destination's mode and ownership
+    are carried over, so a config owned by the BirdNET-Go user stays that way
+    when this runs as root.
+    
+    Args:
+        path: Destination file
+        text: Full file contents
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                st = None
+            if st is not None:
+                os.fchmod(f.fileno(), stat.S_IMODE(st.st_mode))
+                try:
+                    os.fchown(f.fileno(), st.st_uid, st.st_gid)
+                except PermissionError:
+                    # Only root can give a file away; non-root writers keep their own ownership
+                    pass
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
 
 class BirdNETConfigManager:
     """Manages BirdNET-Go configuration file (config.yaml)."""
@@ -29,6 +130,9 @@ class BirdNETConfigManager:
         self.config_path = config_path
         self.backup_path = f"{config_path}.backup"
         self.config_data = None
+        self._location_cache = _NOT_CACHED
+        # Setting paths changed in memory since the last load/save
+        self._dirty_keys = set()
     
     def load(self) -> bool:
         """
@@ -42,8 +146,10 @@ class BirdNETConfigManager:
             return False
         
         try:
+            self._location_cache = _NOT_CACHED
+            self._dirty_keys.clear()
             with open(self.config_path, 'r') as f:
-                self.config_data = yaml.safe_load(f)
+                self.config_data = yaml.load(f, Loader=CSafeLoader)
             print(f"{GREEN}[Config] ✓ Loaded configuration from {self.config_path}{NC}")
             return True
         except (IOError, yaml.YAMLError) as e:
@@ -66,48 +172,152 @@ class BirdNETConfigManager:
         
         try:
             # Create backup if requested
-            if create_backup and os.path.exists(self.config_path):
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                backup_path = f"{self.config_path}.backup_{timestamp}"
-                shutil.copy2(self.config_path, backup_path)
-                print(f"{GREEN}[Config] ✓ Created backup: {backup_path}{NC}")
+            if create_backup:
+                self._create_backup()
             
-            # Write configuration
-            with open(self.config_path, 'w') as f:
-                yaml.dump(self.config_data, f, default_flow_style=False, sort_keys=False)
+            # Write to a new file and swap it in, so a hardlinked backup keeps the old inode
+            text = yaml.dump(self.config_data, Dumper=CSafeDumper, default_flow_style=False, sort_keys=False)
+            _write_atomic(self.config_path, text)
+            self._dirty_keys.clear()
             
             print(f"{GREEN}[Config] ✓ Saved configuration to {self.config_path}{NC}")
             return True
-        except (IOError, yaml.YAMLError) as e:
+        except (IOError, OSError, yaml.YAMLError) as e:
             print(f"{RED}[Config] Failed to save configuration: {e}{NC}")
             return False
     
+    def save_location_inplace(self, latitude: float, longitude: float, create_backup: bool = True) -> bool:
+        """
+        Update latitude/longitude by patching the config file text in place.
+        
+        Only the two values under the top-level 'birdnet:' section are rewritten,
+        so comments and formatting elsewhere in the file are preserved. Falls
+        back to set_location() + save() if the keys cannot be found, if the
+        patched text does not parse back to the new coordinates, or if other
+        settings have been changed in memory and still need saving.
+        
+        Args:
+            latitude: Latitude coordinate
+            longitude: Longitude coordinate
+            create_backup: Whether to create a backup before saving
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            print(f"{RED}[Config] Invalid coordinates: {latitude}, {longitude}{NC}")
+            return False
+        
+        try:
+            with open(self.config_path, 'r') as f:
+                text = f.read()
+        except IOError as e:
+            print(f"{RED}[Config] Failed to read configuration: {e}{NC}")
+            return False
+        
+        if self._dirty_keys - _LOCATION_KEYS:
+            patched = None
+        else:
+            patched = _patch_birdnet_location(text, latitude, longitude)
+        
+        if patched is None:
+            print(f"{YELLOW}[Config] Rewriting full configuration{NC}")
+            if not self.set_location(latitude, longitude):
+                return False
+            return self.save(create_backup=create_backup)
+        
+        try:
+            if create_backup:
+                self._create_backup()
+            
+            _write_atomic(self.config_path, patched)
+        except (IOError, OSError) as e:
+            print(f"{RED}[Config] Failed to save configuration: {e}{NC}")
+            return False
+        
+        # Keep in-memory view consistent with the file (written to 6 decimal places)
+        if self.config_data is not None:
+            self.config_data.setdefault('birdnet', {})
+            self.config_data['birdnet']['latitude'] = round(latitude, 6)
+            self.config_data['birdnet']['longitude'] = round(longitude, 6)
+            self._location_cache = _NOT_CACHED
+        self._dirty_keys -= _LOCATION_KEYS
+        
+        print(f"{GREEN}[Config] ✓ Saved location {latitude:.6f}, {longitude:.6f} to {self.config_path}{NC}")
+        return True
+    
+    def _create_backup(self):
+        """
+        Create a timestamped backup of the current config file, if it exists.
+        
+        The backup is a hardlink when possible. This is safe because saves
+        always replace the config file with a new inode rather than writing
+        into it.
+        """
+        if not os.path.exists(self.config_path):
+            return
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        backup_path = f"{self.config_path}.backup_{timestamp}"
+        try:
+            os.link(self.config_path, backup_path)
+        except OSError:
+            # Cross-device, unsupported filesystem, or existing backup name
+            shutil.copy2(self.config_path, backup_path)
+        print(f"{GREEN}[Config] ✓ Created backup: {backup_path}{NC}")
+        
+        self._prune_backups()
+    
+    def _prune_backups(self, keep: int = MAX_BACKUPS):
+        """
+        Delete all but the newest timestamped backups.
+        
+        Args:
+            keep: Number of backups to retain
+        """
+        backup_dir = os.path.dirname(self.config_path) or '.'
+        backup_basename = os.path.basename(self.config_path) + '.backup_'
+        
+        try:
+            backups = sorted(
+                (f for f in os.listdir(backup_dir) if f.startswith(backup_basename)),
+                reverse=True
+            )
+            for name in backups[keep:]:
+                os.remove(os.path.join(backup_dir, name))
+        except OSError as e:
+            print(f"{YELLOW}[Config] Failed to prune old backups: {e}{NC}")
+    
     def get_location(self) -> Optional[Dict[str, float]]:
         """
         Get current location from configuration.
         
+        The result is cached until the configuration is reloaded or changed
+        through this manager.
+        
         Returns:
             Dict with 'latitude' and 'longitude' keys, or None if not set/invalid
         """
         if self.config_data is None:
             return None
         
-        birdnet_section = self.config_data.get('birdnet', {})
+        if self._location_cache is not _NOT_CACHED:
+            return self._location_cache
+        
+        birdnet_section = _section(self.config_data, 'birdnet')
         lat = birdnet_section.get('latitude')
         lon = birdnet_section.get('longitude')
         
-        # Validate coordinates
-        if lat is None or lon is None:
-            return None
-        
-        if not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)):
-            return None
-        
-        # Check if set to default (0, 0) or invalid range
-        if (lat == 0 and lon == 0) or not (-90 <= lat <= 90 and -180 <= lon <= 180):
-            return None
+        # Validate coordinates: numeric, in range, and not the default (0, 0)
+        if not (isinstance(lat, (int, float)) and isinstance(lon, (int, float))):
+            location = None
+        elif lat == 0 == lon or lat < -90 or lat > 90 or lon < -180 or lon > 180:
+            location = None
+        else:
+            location = {'latitude': float(lat), 'longitude': float(lon)}
         
-        return {'latitude': float(lat), 'longitude': float(lon)}
+        self._location_cache = location
+        return location
     
     def set_location(self, latitude: float, longitude: float) -> bool:
         """
@@ -136,6 +346,8 @@ class BirdNETConfigManager:
         # Update location
         self.config_data['birdnet']['latitude'] = latitude
         self.config_data['birdnet']['longitude'] = longitude
+        self._location_cache = _NOT_CACHED
+        self._dirty_keys |= _LOCATION_KEYS
         
         print(f"{GREEN}[Config] ✓ Updated location: {latitude:.6f}, {longitude:.6f}{NC}")
         return True
@@ -156,23 +368,21 @@ class BirdNETConfigManager:
         if current_location is None:
             return True  # No location set, so this is a change
         
-        # Calculate distance using Haversine formula
-        from math import radians, sin, cos, sqrt, atan2
-        
-        lat1 = radians(current_location['latitude'])
-        lon1 = radians(current_location['longitude'])
-        lat2 = radians(new_latitude)
-        lon2 = radians(new_longitude)
-        
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
+        # Cheap bounds before the exact formula: the great-circle distance is at
+        # least the latitude difference and at most the latitude plus longitude
+        # differences (each measured along a great circle)
+        dlat_km = abs(new_latitude - current_location['latitude']) * KM_PER_DEGREE
+        if dlat_km > threshold_km:
+            print(f"{YELLOW}[Config] Location changed by more than {dlat_km:.1f} km (threshold: {threshold_km} km){NC}")
+            return True
         
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
+        upper_km = dlat_km + abs(new_longitude - current_location['longitude']) * KM_PER_DEGREE
+        if upper_km <= threshold_km:
+            print(f"{GREEN}[Config] Location unchanged (at most {upper_km:.1f} km difference){NC}")
+            return False
         
-        # Earth radius in kilometers
-        radius = 6371
-        distance = radius * c
+        distance = haversine_km(current_location['latitude'], current_location['longitude'],
+                                new_latitude, new_longitude)
         
         if distance > threshold_km:
             print(f"{YELLOW}[Config] Location changed by {distance:.1f} km (threshold: {threshold_km} km){NC}")
@@ -181,6 +391,24 @@ class BirdNETConfigManager:
             print(f"{GREEN}[Config] Location unchanged ({distance:.1f} km difference){NC}")
             return False
     
+    def get_location_distance(self, new_latitude: float, new_longitude: float) -> Optional[float]:
+        """
+        Get distance between the configured location and a new location.
+        
+        Args:
+            new_latitude: New latitude
+            new_longitude: New longitude
+        
+        Returns:
+            Distance in kilometers, or None if no location is configured
+        """
+        current_location = self.get_location()
+        if current_location is None:
+            return None
+        
+        return haversine_km(current_location['latitude'], current_location['longitude'],
+                            new_latitude, new_longitude)
+    
     def get_setting(self, *keys) -> Optional[Any]:
         """
         Get a setting from configuration using dot notation.
@@ -229,6 +457,8 @@ class BirdNETConfigManager:
         
         # Set value
         current[keys[-1]] = value
+        self._location_cache = _NOT_CACHED
+        self._dirty_keys.add(keys)
         return True
     
     def format_config_summary(self) -> str:
@@ -252,9 +482,10 @@ class BirdNETConfigManager:
             lines.append("Location: Not set (0.0, 0.0)")
         
         # Detection settings
-        threshold = self.get_setting('birdnet', 'threshold')
-        sensitivity = self.get_setting('birdnet', 'sensitivity')
-        locale = self.get_setting('birdnet', 'locale')
+        birdnet = _section(self.config_data, 'birdnet')
+        threshold = birdnet.get('threshold')
+        sensitivity = birdnet.get('sensitivity')
+        locale = birdnet.get('locale')
         
         if threshold is not None:
             lines.append(f"Confidence Threshold: {threshold}")
@@ -264,13 +495,72 @@ class BirdNETConfigManager:
             lines.append(f"Locale: {locale}")
         
         # Audio source
-        audio_source = self.get_setting('realtime', 'audio', 'source')
+        audio_source = _section(_section(self.config_data, 'realtime'), 'audio').get('source')
         if audio_source:
             lines.append(f"Audio Source: {audio_source}")
         
         return "\n".join(lines)
 
 
+# Top-level 'birdnet:' section, up to the next top-level key
+_BIRDNET_SECTION_RE = re.compile(r'^birdnet:[ \t]*(?:#.*)?\n((?:[ \t]+.*\n|[ \t]*(?:#.*)?\n)*)', re.MULTILINE)
+
+
+def _patch_birdnet_location(text: str, latitude: float, longitude: float) -> Optional[str]:
+    """
+    Replace birdnet.latitude and birdnet.longitude values in raw YAML text.
+    
+    Args:
+        text: Contents of config.yaml
+        latitude: New latitude
+        longitude: New longitude
+    
+    Returns:
+        Patched text, or None if either key was not found or the patched
+        text does not parse back to the new coordinates
+    """
+    if not text.endswith('\n'):
+        text += '\n'
+    
+    section = _BIRDNET_SECTION_RE.search(text)
+    if section is None:
+        return None
+    
+    # Only match keys at the section's own indentation, not nested ones
+    body = section.group(1)
+    indent = re.search(r'^([ \t]+)[^\s#]', body, re.MULTILINE)
+    if indent is None:
+        return None
+    
+    expected = {}
+    for key, value in (('latitude', latitude), ('longitude', longitude)):
+        # Fixed-point: str() gives e.g. '5e-05', which YAML 1.1 reads back as a string
+        formatted = f"{value:.6f}"
+        expected[key] = float(formatted)
+        # Always put a space after the colon, and keep a trailing comment
+        # separated by the whitespace it already had
+        pattern = rf'^({re.escape(indent.group(1))}{key}:)[^\n]*?([ \t]+#.*)?$'
+        body, count = re.subn(pattern, lambda m: f"{m.group(1)} {formatted}{m.group(2) or ''}",
+                              body, count=1, flags=re.MULTILINE)
+        if count == 0:
+            return None
+    
+    patched = text[:section.start(1)] + body + text[section.end(1):]
+    
+    # Only trust the patch if it parses back to exactly the new coordinates
+    try:
+        data = yaml.load(patched, Loader=CSafeLoader)
+    except yaml.YAMLError:
+        return None
+    birdnet = data.get('birdnet') if isinstance(data, dict) else None
+    if not isinstance(birdnet, dict):
+        return None
+    if any(birdnet.get(key) != value for key, value in expected.items()):
+        return None
+    
+    return patched
+
+
 def restore_from_backup(config_path: str) -> bool:
     """
     Restore configuration from most recent backup.
@@ -282,25 +572,29 @@ def restore_from_backup(config_path: str) -> bool:
         True if successful, False otherwise
     """
     # Find most recent backup
-    backup_dir = os.path.dirname(config_path)
+    backup_dir = os.path.dirname(config_path) or '.'
     backup_basename = os.path.basename(config_path) + '.backup_'
     
     try:
-        backups = [
-            f for f in os.listdir(backup_dir)
-            if f.startswith(backup_basename)
-        ]
-        
-        if not backups:
+        # Filename format config.yaml.backup_YYYYMMDD_HHMMSS sorts by timestamp,
+        # so a single pass tracking the largest name finds the newest backup
+        newest = None
+        with os.scandir(backup_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(backup_basename) and (newest is None or name > newest):
+                    newest = name
+        
+        if newest is None:
             print(f"{RED}[Config] No backups found{NC}")
             return False
         
-        # Sort by timestamp (filename format: config.yaml.backup_YYYYMMDD_HHMMSS)
-        backups.sort(reverse=True)
-        most_recent = os.path.join(backup_dir, backups[0])
+        most_recent = os.path.join(backup_dir, newest)
         
-        # Restore
-        shutil.copy2(most_recent, config_path)
+        # Restore via a new file so a hardlinked backup is never written into
+        tmp_path = f"{config_path}.tmp"
+        shutil.copy2(most_recent, tmp_path)
+        os.replace(tmp_path, config_path)
         print(f"{GREEN}[Config] ✓ Restored from backup: {most_recent}{NC}")
         return True
     
@@ -3,190 +3,617 @@ Geolocation Detection Module
 Provides multiple methods for determining device location with fallback chain.
 """
 
-import requests
+import importlib.util
+import ipaddress
 import json
 import os
-import subprocess
-from typing import Optional, Dict, Tuple
+import select
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
+from typing import Optional, Dict, Tuple, Callable
 
-# Color codes for terminal output
-GREEN = '\033[0;32m'
-YELLOW = '\033[1;33m'
-RED = '\033[0;31m'
-NC = '\033[0m'  # No Color
+# Use orjson for parsing when available; its JSONDecodeError subclasses
+# json.JSONDecodeError, so existing except clauses still apply
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Color codes for terminal output (disabled when not a TTY or NO_COLOR is set)
+_USE_COLOR = sys.stdout.isatty() and os.environ.get('NO_COLOR') is None
+if _USE_COLOR:
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'  # No Color
+else:
+    GREEN = YELLOW = RED = NC = ''
+
+
+def _log(color: str, message: str):
+    """Print a message wrapped in a color code."""
+    print(color + message + NC)
+
+# Last detected location is reused until it is older than the TTL
+# (matches the template's cache.update_interval_days)
+LOCATION_CACHE_PATH = os.path.expanduser('~/.cache/birdnet_display/location.json')
+LOCATION_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Manual location config files, in priority order
+MANUAL_CONFIG_PATHS = (
+    'location_config.json',
+    '/home/jeremy/birdnet_display/location_config.json',
+    os.path.expanduser('~/birdnet_display/location_config.json')
+)
+
+# Offline GeoLite2/DB-IP City database (geoipupdate's default location on Debian)
+MMDB_PATH = '/var/lib/GeoIP/GeoLite2-City.mmdb'
+
+# Returns the caller's public IP address as plain text
+PUBLIC_IP_URL = 'https://api.ipify.org'
+
+# Seconds a fetched public IP is reused before probing again
+PUBLIC_IP_TTL = 30 * 60
+
+# gpsd's default listening address
+GPSD_ADDRESS = ('127.0.0.1', 2947)
 
 
 class LocationDetector:
     """Detects device location using multiple methods with fallback chain."""
     
-    def __init__(self, timeout: int = 10):
+    # (ip, expires_at) shared by all instances, expires_at on time.monotonic()
+    _public_ip_cache: Tuple[Optional[str], float] = (None, 0.0)
+    
+    # Headers sent with every API request, sync or async
+    _HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (compatible; BirdNET-Display/1.0)',
+        'Accept-Encoding': 'gzip, deflate'
+    }
+    
+    def __init__(self, timeout: int = 10, cache_path: Optional[str] = LOCATION_CACHE_PATH,
+                 cache_ttl: float = LOCATION_CACHE_TTL, gps_timeout: float = 5,
+                 connect_timeout: float = 2, mmdb_path: Optional[str] = MMDB_PATH):
         """
         Initialize location detector.
         
         Args:
-            timeout: Timeout in seconds for API requests
+            timeout: Read timeout in seconds for API requests
+            connect_timeout: Connect timeout in seconds for API requests, kept
+                short so unreachable APIs fail fast
+            gps_timeout: Maximum seconds to wait for a GPS fix
+            cache_path: File to cache the detected location in (None disables caching)
+            cache_ttl: Seconds a cached location stays valid
+            mmdb_path: Offline City .mmdb database to try before the online APIs
+                (None disables the offline lookup)
         """
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (compatible; BirdNET-Display/1.0)'
-        })
+        self.connect_timeout = connect_timeout
+        self.gps_timeout = gps_timeout
+        self.cache_path = cache_path
+        self.ttl_seconds = cache_ttl
+        self.mmdb_path = mmdb_path
+        self._mmdb_reader = None
+    
+    @cached_property
+    def _pool(self):
+        """Connection pool for the IP APIs, created on the first request."""
+        # Imported here so cached lookups and format_location_info never pull in urllib3/ssl
+        import urllib3
+        
+        # Keep connections alive across calls and retry transient server errors.
+        # Connect/read failures are not retried, so a stalled API costs one timeout.
+        return urllib3.PoolManager(
+            num_pools=4,
+            maxsize=4,
+            headers=self._HEADERS,
+            retries=urllib3.Retry(total=2, connect=0, read=0, backoff_factor=0.2,
+                                  status_forcelist=[429, 500, 502, 503, 504])
+        )
     
-    def detect_location(self) -> Optional[Dict[str, any]]:
+    def detect_location(self, force_refresh: bool = False) -> Optional[Dict[str, any]]:
         """
         Detect location using multiple methods with fallback chain.
         
+        A fresh cached result is returned without any network or GPS access.
+        
+        Args:
+            force_refresh: If True, ignore the cache and detect again
+        
         Returns:
             Dict with keys: latitude, longitude, method, description, accuracy
             None if all methods fail
         """
+        if not force_refresh:
+            location = self.get_cached_location()
+            if location:
+                _log(GREEN, f"[Location] ✓ Using cached location: {location['description']}")
+                return location
+        
+        location = self._detect_uncached()
+        if location:
+            self._save_cache(location)
+        return location
+    
+    async def detect_location_async(self, force_refresh: bool = False) -> Optional[Dict[str, any]]:
+        """
+        Async version of detect_location for callers running an event loop.
+        
+        The IP APIs are queried with aiohttp so the loop stays free while
+        waiting on the network; blocking steps (offline database, GPS, manual
+        config) run in a worker thread. Without aiohttp the whole sync chain
+        runs in a worker thread instead.
+        
+        Args:
+            force_refresh: If True, ignore the cache and detect again
+        
+        Returns:
+            Location dict or None if all methods fail
+        """
+        # Imported here rather than at module level; only the async path needs it
+        import asyncio
+        
+        if importlib.util.find_spec('aiohttp') is None:
+            return await asyncio.to_thread(self.detect_location, force_refresh)
+        
+        if not force_refresh:
+            location = self.get_cached_location()
+            if location:
+                _log(GREEN, f"[Location] ✓ Using cached location: {location['description']}")
+                return location
+        
+        location = None
+        if self.mmdb_path and os.path.exists(self.mmdb_path):
+            _log(YELLOW, "[Location] Checking offline IP database...")
+            location = await asyncio.to_thread(self._try_mmdb)
+        
+        if not location:
+            _log(YELLOW, "[Location] Attempting IP geolocation...")
+            location = await self._async_try_ip_geolocation()
+        
+        if not location:
+            location = await asyncio.to_thread(self._detect_local)
+        
+        if location:
+            self._save_cache(location)
+        return location
+    
+    def get_cached_location(self) -> Optional[Dict[str, any]]:
+        """
+        Get the cached location if it exists and has not expired.
+        
+        Returns:
+            Location dict or None
+        """
+        if not self.cache_path:
+            return None
+        
+        try:
+            with open(self.cache_path, 'r') as f:
+                entry = json_loads(f.read())
+            age = time.time() - entry['ts']
+            location = entry['location']
+            if not 0 <= age < self.ttl_seconds:
+                return None
+            if not self._validate_coordinates(location['latitude'], location['longitude']):
+                return None
+            return location
+        except (OSError, ValueError, KeyError, TypeError):
+            # ValueError covers JSONDecodeError and UnicodeDecodeError from a corrupt file
+            return None
+    
+    def _save_cache(self, location: Dict[str, any]):
+        """
+        Write a detected location to the cache file atomically.
+        
+        Args:
+            location: Location dict to cache
+        """
+        if not self.cache_path:
+            return
+        
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({'ts': time.time(), 'location': location}, f)
+            os.replace(tmp_path, self.cache_path)
+        except (IOError, OSError, TypeError) as e:
+            _log(YELLOW, f"[Location] Could not write location cache: {e}")
+    
+    def _detect_uncached(self) -> Optional[Dict[str, any]]:
+        """
+        Run the offline IP database -> IP -> GPS -> manual config fallback chain.
+        
+        Returns:
+            Location dict or None
+        """
+        # Method 0: Offline IP database (only if installed)
+        if self.mmdb_path and os.path.exists(self.mmdb_path):
+            _log(YELLOW, "[Location] Checking offline IP database...")
+            location = self._try_mmdb()
+            if location:
+                return location
+        
         # Method 1: IP Geolocation (primary)
-        print(f"{YELLOW}[Location] Attempting IP geolocation...{NC}")
+        _log(YELLOW, "[Location] Attempting IP geolocation...")
         location = self._try_ip_geolocation()
         if location:
             return location
         
+        return self._detect_local()
+    
+    def _detect_local(self) -> Optional[Dict[str, any]]:
+        """
+        Run the GPS -> manual config tail of the fallback chain.
+        
+        Returns:
+            Location dict or None
+        """
         # Method 2: GPS Hardware (secondary)
-        print(f"{YELLOW}[Location] Checking for GPS hardware...{NC}")
+        _log(YELLOW, "[Location] Checking for GPS hardware...")
         location = self._try_gps_hardware()
         if location:
             return location
         
         # Method 3: Manual config file (tertiary)
-        print(f"{YELLOW}[Location] Checking for manual configuration...{NC}")
+        _log(YELLOW, "[Location] Checking for manual configuration...")
         location = self._try_manual_config()
         if location:
             return location
         
-        print(f"{RED}[Location] All detection methods failed{NC}")
+        _log(RED, "[Location] All detection methods failed")
         return None
     
+    def _try_mmdb(self) -> Optional[Dict[str, any]]:
+        """
+        Look up the public IP in an offline MaxMind/DB-IP City database.
+        
+        Needs one small request to learn the public IP; the lookup itself is
+        a local memory-mapped read.
+        
+        Returns:
+            Location dict or None
+        """
+        try:
+            import maxminddb
+        except ImportError:
+            _log(YELLOW, "[Location] maxminddb package not installed")
+            return None
+        
+        try:
+            if self._mmdb_reader is None:
+                self._mmdb_reader = maxminddb.open_database(self.mmdb_path, maxminddb.MODE_MMAP)
+            
+            ip = self._get_public_ip()
+            if not ip:
+                return None
+            
+            record = self._mmdb_reader.get(ip)
+        except (OSError, ValueError, maxminddb.InvalidDatabaseError) as e:
+            _log(YELLOW, f"[Location] Offline IP lookup failed: {e}")
+            return None
+        
+        if not record or 'location' not in record:
+            return None
+        
+        lat = record['location'].get('latitude')
+        lon = record['location'].get('longitude')
+        if lat is None or lon is None or not self._validate_coordinates(lat, lon):
+            return None
+        
+        def name(entry):
+            return (entry or {}).get('names', {}).get('en', '')
+        
+        parts = (name(record.get('city')) or 'Unknown',
+                 name((record.get('subdivisions') or [None])[0]),
+                 name(record.get('country')) or 'Unknown')
+        radius = record['location'].get('accuracy_radius')
+        location = {
+            'latitude': float(lat),
+            'longitude': float(lon),
+            'method': 'offline IP database',
+            'description': ', '.join(p for p in parts if p),
+            'accuracy': f'city-level (~{radius}km)' if radius else 'city-level (~10-50km)'
+        }
+        _log(GREEN, f"[Location] ✓ Detected via {location['method']}: "
+                    f"{location['description']} ({location['latitude']:.4f}, {location['longitude']:.4f})")
+        return location
+    
+    def _http_get(self, pool, url: str, read_timeout: float) -> bytes:
+        """
+        GET a URL through the shared connection pool.
+        
+        Args:
+            pool: urllib3.PoolManager to request through (normally self._pool)
+            url: URL to fetch
+            read_timeout: Read timeout in seconds
+        
+        Returns:
+            Response body (decompressed)
+        
+        Raises:
+            urllib3.exceptions.HTTPError: On connection failure or HTTP error status
+        """
+        import urllib3
+        response = pool.request(
+            'GET', url,
+            timeout=urllib3.Timeout(connect=self.connect_timeout, read=read_timeout)
+        )
+        if response.status >= 400:
+            raise urllib3.exceptions.HTTPError(f"HTTP {response.status} for {url}")
+        return response.data
+    
+    def _get_public_ip(self) -> Optional[str]:
+        """
+        Get this device's public IP address.
+        
+        The result is shared across detector instances for PUBLIC_IP_TTL
+        seconds, so repeated detections only probe once.
+        
+        Returns:
+            IP address string, or None if it could not be determined
+        """
+        ip, expires_at = LocationDetector._public_ip_cache
+        if ip and time.monotonic() < expires_at:
+            return ip
+        
+        import urllib3
+        try:
+            body = self._http_get(self._pool, PUBLIC_IP_URL, 3).decode('ascii').strip()
+            # Rejects e.g. a captive portal's HTML page before it gets cached
+            ip = str(ipaddress.ip_address(body))
+        except (urllib3.exceptions.HTTPError, ValueError) as e:
+            _log(YELLOW, f"[Location] Could not determine public IP: {e}")
+            return None
+        
+        LocationDetector._public_ip_cache = (ip, time.monotonic() + PUBLIC_IP_TTL)
+        return ip
+    
     def _try_ip_geolocation(self) -> Optional[Dict[str, any]]:
         """
-        Try multiple IP geolocation APIs with fallback.
+        Query multiple IP geolocation APIs concurrently.
+        
+        All APIs are requested at once and the first valid response wins, so
+        a slow or dead API no longer delays the others.
         
         Returns:
             Location dict or None
         """
-        # API list in priority order
-        apis = [
-            {
-                'url': 'https://ipapi.co/json/',
-                'parser': self._parse_ipapi_co
-            },
-            {
-                'url': 'http://ip-api.com/json/',
-                'parser': self._parse_ip_api_com
-            },
-            {
-                'url': 'https://ipinfo.io/json',
-                'parser': self._parse_ipinfo_io
+        import urllib3
+        # Create the pool here rather than racing to create it in the workers
+        pool = self._pool
+        executor = ThreadPoolExecutor(max_workers=len(self._IP_APIS))
+        try:
+            futures = {
+                executor.submit(self._http_get, pool, url, self.timeout): (url, parser, error_marker)
+                for url, parser, error_marker in self._IP_APIS
             }
-        ]
+            
+            for future in as_completed(futures):
+                url, parser, error_marker = futures[future]
+                try:
+                    raw = future.result()
+                except urllib3.exceptions.HTTPError as e:
+                    _log(YELLOW, f"[Location] API {url} failed: {e}")
+                    continue
+                location = self._parse_api_response(url, parser, error_marker, raw)
+                if location:
+                    return location
+        finally:
+            # Don't wait for slower APIs once we have an answer
+            executor.shutdown(wait=False, cancel_futures=True)
         
-        for api in apis:
+        return None
+    
+    async def _async_try_ip_geolocation(self) -> Optional[Dict[str, any]]:
+        """
+        Query multiple IP geolocation APIs concurrently with aiohttp.
+        
+        The first valid response wins and the remaining requests are cancelled.
+        
+        Returns:
+            Location dict or None
+        """
+        import asyncio
+        import aiohttp
+        timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.timeout)
+        async with aiohttp.ClientSession(headers=self._HEADERS, timeout=timeout) as session:
+            tasks = [
+                asyncio.create_task(self._fetch_parse(session, url, parser, error_marker))
+                for url, parser, error_marker in self._IP_APIS
+            ]
             try:
-                response = self.session.get(api['url'], timeout=self.timeout)
+                for next_done in asyncio.as_completed(tasks, timeout=self.connect_timeout + self.timeout):
+                    location = await next_done
+                    if location:
+                        return location
+            except asyncio.TimeoutError:
+                _log(YELLOW, "[Location] IP geolocation APIs timed out")
+            finally:
+                # Don't wait for slower APIs once we have an answer
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return None
+    
+    async def _fetch_parse(self, session, url: str,
+                           parser: Callable[[Dict], Optional[Dict[str, any]]],
+                           error_marker: bytes) -> Optional[Dict[str, any]]:
+        """
+        Fetch one IP geolocation API with aiohttp and parse its response.
+        
+        Args:
+            session: aiohttp.ClientSession to request with
+            url: API URL
+            parser: Parser for the API's JSON response
+            error_marker: Byte string only present in the API's error responses
+        
+        Returns:
+            Location dict or None
+        """
+        import asyncio
+        import aiohttp
+        try:
+            async with session.get(url) as response:
                 response.raise_for_status()
-                data = response.json()
-                location = api['parser'](data)
-                if location and self._validate_coordinates(location['latitude'], location['longitude']):
-                    print(f"{GREEN}[Location] ✓ Detected via {location['method']}: "
-                          f"{location['description']} ({location['latitude']:.4f}, {location['longitude']:.4f}){NC}")
-                    return location
-            except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError) as e:
-                print(f"{YELLOW}[Location] API {api['url']} failed: {e}{NC}")
-                continue
+                raw = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _log(YELLOW, f"[Location] API {url} failed: {e}")
+            return None
+        return self._parse_api_response(url, parser, error_marker, raw)
+    
+    def _parse_api_response(self, url: str,
+                            parser: Callable[[Dict], Optional[Dict[str, any]]],
+                            error_marker: bytes, raw: bytes) -> Optional[Dict[str, any]]:
+        """
+        Decode, parse and validate one IP geolocation API response body.
+        
+        Args:
+            url: API URL (for log messages)
+            parser: Parser for the API's JSON response
+            error_marker: Byte string only present in the API's error responses
+            raw: Response body
         
+        Returns:
+            Location dict or None if the response is an error or invalid
+        """
+        # Skip decoding responses that are already known to be errors
+        if error_marker in raw:
+            _log(YELLOW, f"[Location] API {url} returned an error response")
+            return None
+        try:
+            location = parser(json_loads(raw))
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError, AttributeError) as e:
+            # Null fields or a non-object body must not abort the other APIs
+            _log(YELLOW, f"[Location] API {url} failed: {e}")
+            return None
+        if location and self._validate_coordinates(location['latitude'], location['longitude']):
+            _log(GREEN, f"[Location] ✓ Detected via {location['method']}: "
+                        f"{location['description']} ({location['latitude']:.4f}, {location['longitude']:.4f})")
+            return location
         return None
     
-    def _parse_ipapi_co(self, data: Dict) -> Optional[Dict[str, any]]:
+    @staticmethod
+    def _parse_ipapi_co(data: Dict) -> Optional[Dict[str, any]]:
         """Parse ipapi.co response."""
         if 'error' in data:
             return None
         
+        parts = (data.get('city') or 'Unknown', data.get('region') or '', data.get('country_name') or 'Unknown')
         return {
             'latitude': float(data['latitude']),
             'longitude': float(data['longitude']),
             'method': 'ipapi.co',
-            'description': f"{data.get('city', 'Unknown')}, {data.get('region', '')}, {data.get('country_name', 'Unknown')}".strip(', '),
+            'description': ', '.join(p for p in parts if p),
             'accuracy': 'city-level (~10-50km)'
         }
     
-    def _parse_ip_api_com(self, data: Dict) -> Optional[Dict[str, any]]:
+    @staticmethod
+    def _parse_ip_api_com(data: Dict) -> Optional[Dict[str, any]]:
         """Parse ip-api.com response."""
         if data.get('status') != 'success':
             return None
         
+        parts = (data.get('city') or 'Unknown', data.get('regionName') or '', data.get('country') or 'Unknown')
         return {
             'latitude': float(data['lat']),
             'longitude': float(data['lon']),
             'method': 'ip-api.com',
-            'description': f"{data.get('city', 'Unknown')}, {data.get('regionName', '')}, {data.get('country', 'Unknown')}".strip(', '),
+            'description': ', '.join(p for p in parts if p),
             'accuracy': 'city-level (~10-50km)'
         }
     
-    def _parse_ipinfo_io(self, data: Dict) -> Optional[Dict[str, any]]:
+    @staticmethod
+    def _parse_ipinfo_io(data: Dict) -> Optional[Dict[str, any]]:
         """Parse ipinfo.io response."""
         if 'loc' not in data:
             return None
         
         lat, lon = data['loc'].split(',')
+        parts = (data.get('city') or 'Unknown', data.get('region') or '', data.get('country') or 'Unknown')
         return {
             'latitude': float(lat),
             'longitude': float(lon),
             'method': 'ipinfo.io',
-            'description': f"{data.get('city', 'Unknown')}, {data.get('region', '')}, {data.get('country', 'Unknown')}".strip(', '),
+            'description': ', '.join(p for p in parts if p),
             'accuracy': 'city-level (~10-50km)'
         }
     
+    # IP geolocation APIs as (url, parser, error marker) tuples, built once for
+    # all calls. The error marker is a byte string that only appears in that
+    # API's failure responses. Parsers are unwrapped from staticmethod so they
+    # are plain callables.
+    _IP_APIS: Tuple[Tuple[str, Callable[[Dict], Optional[Dict[str, any]]], bytes], ...] = (
+        ('https://ipapi.co/json/', _parse_ipapi_co.__func__, b'"error"'),
+        ('http://ip-api.com/json/', _parse_ip_api_com.__func__, b'"fail"'),
+        ('https://ipinfo.io/json', _parse_ipinfo_io.__func__, b'"error"'),
+    )
+    
     def _try_gps_hardware(self) -> Optional[Dict[str, any]]:
         """
         Try to get location from GPS hardware via gpsd.
         
+        Speaks gpsd's JSON protocol directly over its TCP socket, reading
+        reports until a TPV fix arrives or gps_timeout expires.
+        
         Returns:
             Location dict or None
         """
+        # Connecting doubles as the check that gpsd is running
         try:
-            # Check if gpsd is running
-            result = subprocess.run(
-                ['systemctl', 'is-active', 'gpsd'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if result.returncode != 0:
-                print(f"{YELLOW}[Location] gpsd service not running{NC}")
-                return None
+            sock = socket.create_connection(GPSD_ADDRESS, timeout=1)
+        except OSError:
+            _log(YELLOW, "[Location] gpsd service not running")
+            return None
+        
+        try:
+            sock.sendall(b'?WATCH={"enable":true,"json":true};\n')
             
-            # Try to get position from gpsd
-            # This requires python-gps package
-            try:
-                import gps
-                session = gps.gps(mode=gps.WATCH_ENABLE)
+            # Read reports until a fix arrives or the deadline passes; a
+            # silent gpsd must not block the fallback chain indefinitely
+            deadline = time.monotonic() + self.gps_timeout
+            buffer = b''
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                    _log(YELLOW, f"[Location] No GPS fix within {self.gps_timeout}s")
+                    break
                 
-                # Try to get a fix (wait up to 30 seconds)
-                for _ in range(30):
-                    report = session.next()
-                    if report['class'] == 'TPV':
-                        if hasattr(report, 'lat') and hasattr(report, 'lon'):
-                            if self._validate_coordinates(report.lat, report.lon):
-                                print(f"{GREEN}[Location] ✓ Detected via GPS hardware{NC}")
-                                return {
-                                    'latitude': report.lat,
-                                    'longitude': report.lon,
-                                    'method': 'GPS hardware',
-                                    'description': f'GPS Fix ({report.lat:.6f}, {report.lon:.6f})',
-                                    'accuracy': 'high-precision (~5-10m)'
-                                }
-            except ImportError:
-                print(f"{YELLOW}[Location] python-gps package not installed{NC}")
-            except Exception as e:
-                print(f"{YELLOW}[Location] GPS read failed: {e}{NC}")
-        
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError, FileNotFoundError):
-            pass
+                chunk = sock.recv(4096)
+                if not chunk:
+                    _log(YELLOW, "[Location] gpsd closed the connection")
+                    break
+                
+                # gpsd sends one JSON object per line
+                *lines, buffer = (buffer + chunk).split(b'\n')
+                for line in lines:
+                    try:
+                        report = json_loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    
+                    if not isinstance(report, dict) or report.get('class') != 'TPV':
+                        continue
+                    lat = report.get('lat')
+                    lon = report.get('lon')
+                    if lat is not None and lon is not None and self._validate_coordinates(lat, lon):
+                        _log(GREEN, "[Location] ✓ Detected via GPS hardware")
+                        return {
+                            'latitude': lat,
+                            'longitude': lon,
+                            'method': 'GPS hardware',
+                            'description': f'GPS Fix ({lat:.6f}, {lon:.6f})',
+                            'accuracy': 'high-precision (~5-10m)'
+                        }
+        except OSError as e:
+            _log(YELLOW, f"[Location] GPS read failed: {e}")
+        finally:
+            sock.close()
         
         return None
     
@@ -197,36 +624,31 @@ class LocationDetector:
         Returns:
             Location dict or None
         """
-        config_paths = [
-            'location_config.json',
-            '/home/jeremy/birdnet_display/location_config.json',
-            os.path.expanduser('~/birdnet_display/location_config.json')
-        ]
-        
-        for path in config_paths:
-            if os.path.exists(path):
-                try:
-                    with open(path, 'r') as f:
-                        config = json.load(f)
+        for path in MANUAL_CONFIG_PATHS:
+            try:
+                with open(path, 'r') as f:
+                    config = json_loads(f.read())
+                
+                if 'location' in config:
+                    loc = config['location']
+                    lat = loc.get('latitude')
+                    lon = loc.get('longitude')
                     
-                    if 'location' in config:
-                        loc = config['location']
-                        lat = loc.get('latitude')
-                        lon = loc.get('longitude')
-                        
-                        if lat is not None and lon is not None:
-                            if self._validate_coordinates(lat, lon):
-                                print(f"{GREEN}[Location] ✓ Using manual configuration from {path}{NC}")
-                                return {
-                                    'latitude': float(lat),
-                                    'longitude': float(lon),
-                                    'method': 'manual configuration',
-                                    'description': loc.get('description', f'Manual ({lat:.4f}, {lon:.4f})'),
-                                    'accuracy': 'user-specified'
-                                }
-                except (IOError, json.JSONDecodeError, KeyError, ValueError) as e:
-                    print(f"{YELLOW}[Location] Failed to read config {path}: {e}{NC}")
-                    continue
+                    if lat is not None and lon is not None:
+                        if self._validate_coordinates(lat, lon):
+                            _log(GREEN, f"[Location] ✓ Using manual configuration from {path}")
+                            return {
+                                'latitude': float(lat),
+                                'longitude': float(lon),
+                                'method': 'manual configuration',
+                                'description': loc.get('description', f'Manual ({lat:.4f}, {lon:.4f})'),
+                                'accuracy': 'user-specified'
+                            }
+            except FileNotFoundError:
+                continue
+            except (IOError, json.JSONDecodeError, KeyError, ValueError) as e:
+                _log(YELLOW, f"[Location] Failed to read config {path}: {e}")
+                continue
         
         return None
     
@@ -241,15 +663,8 @@ class LocationDetector:
         Returns:
             True if valid, False otherwise
         """
-        # Check valid ranges
-        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
-            return False
-        
-        # Check not default/null island (0, 0)
-        if lat == 0 and lon == 0:
-            return False
-        
-        return True
+        # Valid ranges, and not the default/null island (0, 0)
+        return abs(lat) <= 90.0 and abs(lon) <= 180.0 and (lat != 0.0 or lon != 0.0)
     
     def format_location_info(self, location: Dict[str, any]) -> str:
         """
@@ -297,11 +712,11 @@ def create_manual_config_template(output_path: str = 'location_config.json'):
     try:
         with open(output_path, 'w') as f:
             json.dump(template, f, indent=2)
-        print(f"{GREEN}[Config] Created template configuration at {output_path}{NC}")
-        print(f"{YELLOW}[Config] Please edit this file with your actual coordinates{NC}")
+        _log(GREEN, f"[Config] Created template configuration at {output_path}")
+        _log(YELLOW, "[Config] Please edit this file with your actual coordinates")
         return True
     except IOError as e:
-        print(f"{RED}[Config] Failed to create template: {e}{NC}")
+        _log(RED, f"[Config] Failed to create template: {e}")
         return False
 
 